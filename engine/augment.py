@@ -3,47 +3,78 @@
 # @author: Louis Rossignol
 
 import numpy as np
-import torch
-from tqdm import tqdm
 from engine.seed_settings import set_seed
 from engine.treament import normalize_data
-from engine.treament import line_noise
+from engine.treament import lines_pattern
 set_seed(10)
 
 def data_augmentation(
     E: np.ndarray,
     labels: tuple,
-    ) -> np.ndarray:
-    
+    ) -> tuple:
+    """
+    Expands the dataset with fringes at different angles without copying the images.
+
+    Every image of E is associated to each augmentation variant through an index mapping,
+    the augmented images are only computed when they are fetched by the FieldDataset.
+
+    Parameters:
+    - E (np.ndarray): The dataset of shape (N, 3, resolution, resolution).
+    - labels (tuple): The number of n2, the n2 labels, the number of isat and the isat labels.
+
+    Returns:
+    - augmentations (tuple): The image indices, the variant indices and the list of variants,
+      a variant being None for an original or (noise, angle, num_lines) for a fringe pattern.
+    - labels (tuple): The labels repeated for each variant.
+    """
     number_of_n2, n2_labels, number_of_isat, isat_labels = labels
 
     angles = np.random.uniform(0,180,3)
     noises = np.random.uniform(0.1,0.4,2)
     lines = [20, 50, 100]
     originals = 18
-    augmentation = len(lines) * len(noises) * len(angles) + originals
+    variants = [None] * originals
+    for noise in noises:
+        for angle in angles:
+            for num_lines in lines:
+                variants.append((noise, angle, num_lines))
+    augmentation = len(variants)
 
     n2_labels = np.repeat(n2_labels, augmentation)
     isat_labels = np.repeat(isat_labels, augmentation)
 
     labels = (number_of_n2, n2_labels, number_of_isat, isat_labels)
-    
-    augmented_data = np.zeros((augmentation*E.shape[0], E.shape[1], E.shape[2],E.shape[3]), dtype=np.float16)
-
-    index = 0
-    for image_index in tqdm(range(E.shape[0]),desc=f"EXPANSION", 
-                                total=number_of_n2*number_of_isat, unit="frame"):
-        for original in range(originals):
-            augmented_data[index,0 ,:, :] = E[image_index,0,:,:]
-            augmented_data[index,1 ,:, :] = E[image_index,1,:,:]
-            augmented_data[index,2 ,:, :] = E[image_index,2,:,:]
-            index += 1  
-        for noise in noises:
-            for angle in angles:
-                for num_lines in lines:
-                    augmented_data[index,0 ,:, :] = normalize_data(line_noise(E[image_index,0,:,:], num_lines, np.max(E[image_index,0,:,:])*noise,angle))
-                    augmented_data[index,1 ,:, :] = E[image_index,1,:,:]
-                    augmented_data[index,2 ,:, :] = E[image_index,2,:,:]
-                    index += 1
+
+    image_indices = np.repeat(np.arange(E.shape[0]), augmentation)
+    variant_indices = np.tile(np.arange(augmentation), E.shape[0])
+    augmentations = (image_indices, variant_indices, variants)
               
-    return augmented_data, labels
\ No newline at end of file
+    return augmentations, labels
+
+def augment_batch(
+    images: np.ndarray,
+    variants: list,
+    ) -> np.ndarray:
+    """
+    Applies the augmentation variants to a batch of images in place.
+
+    Parameters:
+    - images (np.ndarray): The batch of images of shape (B, 3, resolution, resolution).
+    - variants (list): The variant of each image, None for an original or (noise, angle, num_lines).
+
+    Returns:
+    - images (np.ndarray): The augmented batch of images.
+    """
+    noisy = [index for index, variant in enumerate(variants) if variant is not None]
+    if not noisy:
+        return images
+    
+    height, width = images.shape[-2:]
+    densities = images[noisy, 0, :, :]
+    noises = np.array([variants[index][0] for index in noisy], dtype=np.float32)
+
+    lines = np.stack([lines_pattern(height, width, num_lines, float(angle)) for noise, angle, num_lines in (variants[index] for index in noisy)])
+    lines *= noises[:, np.newaxis, np.newaxis] * np.max(densities, axis=(-2, -1), keepdims=True)
+    lines += densities
+    images[noisy, 0, :, :] = normalize_data(lines)
+    return images
\ No newline at end of file
@@ -7,28 +7,38 @@ import torch
 import numpy as np
 from torch.utils.data import Dataset
 from engine.seed_settings import set_seed
+from engine.augment import augment_batch
 set_seed(10)
 
 class FieldDataset(Dataset):
     def __init__(
             self, 
             data: np.ndarray, 
+            augmentations: tuple,
             n2_values: np.ndarray, 
             isat_values: np.ndarray):
         
         self.n2_values = torch.from_numpy(n2_values).to(torch.float16).unsqueeze(1)
         self.isat_values = torch.from_numpy(isat_values).to(torch.float16).unsqueeze(1)
-        self.data = torch.from_numpy(data).to(torch.float16)
+        self.data = data
+        self.image_indices, self.variant_indices, self.variants = augmentations
 
     def __len__(
             self) -> int:
-        return len(self.data)
+        return len(self.image_indices)
 
     def __getitem__(
             self, 
             idx: int) -> tuple:
-        data_item = self.data[idx,:,:,:]
-        n2_label = self.n2_values[idx]
-        isat_label = self.isat_values[idx]
+        return self.__getitems__([idx])[0]
 
-        return  data_item, n2_label, isat_label
\ No newline at end of file
+    def __getitems__(
+            self, 
+            indices: list) -> list:
+        images = self.data[self.image_indices[indices],:,:,:]
+        variants = [self.variants[variant_index] for variant_index in self.variant_indices[indices]]
+        data_items = torch.from_numpy(augment_batch(images, variants)).to(torch.float16)
+        n2_labels = self.n2_values[indices]
+        isat_labels = self.isat_values[indices]
+
+        return list(zip(data_items, n2_labels, isat_labels))
\ No newline at end of file
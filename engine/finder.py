@@ -18,7 +18,7 @@ from torch.optim.lr_scheduler import ReduceLROnPlateau
 set_seed(10)
 
 def data_split(
-        E: np.ndarray, 
+        augmentations: tuple, 
         n2_labels: np.ndarray,
         isat_labels: np.ndarray,
         train_ratio: float = 0.8, 
@@ -27,8 +27,10 @@ def data_split(
         ) -> tuple:
     assert train_ratio + validation_ratio + test_ratio == 1
     
+    image_indices, variant_indices, variants = augmentations
+
     np.random.seed(0)
-    indices = np.arange(E.shape[0])
+    indices = np.arange(image_indices.shape[0])
     np.random.shuffle(indices)
     
     train_index = int(len(indices) * train_ratio)
@@ -38,9 +40,9 @@ def data_split(
     validation_indices = indices[train_index:validation_index]
     test_indices = indices[validation_index:]
 
-    train = E[training_indices,:,:,:].copy()
-    validation = E[validation_indices,:,:,:].copy()
-    test = E[test_indices,:,:,:].copy()
+    train = image_indices[training_indices], variant_indices[training_indices], variants
+    validation = image_indices[validation_indices], variant_indices[validation_indices], variants
+    test = image_indices[test_indices], variant_indices[test_indices], variants
 
     train_n2 = n2_labels[training_indices].copy()
     validation_n2 = n2_labels[validation_indices].copy()
@@ -53,12 +55,13 @@ def data_split(
     return (train, train_n2, train_isat), (validation, validation_n2, validation_isat), (test, test_n2, test_isat)
 
 def create_loaders(
-        sets: np.ndarray, 
+        E: np.ndarray,
+        sets: tuple, 
         batch_size: int
         ) -> DataLoader:
     
-    set, n2label, isatlabel = sets 
-    fieldset = FieldDataset(set, n2label, isatlabel)
+    augmentations, n2label, isatlabel = sets 
+    fieldset = FieldDataset(E, augmentations, n2label, isatlabel)
     fieldloader = DataLoader(fieldset, batch_size=batch_size, shuffle=True)
 
     return fieldloader
@@ -94,6 +97,7 @@ def prepare_training(
         nlse_settings: tuple, 
         labels: tuple, 
         E: np.ndarray,
+        augmentations: tuple,
         path: str, 
         learning_rate: float, 
         batch_size: int, 
@@ -115,20 +119,21 @@ def prepare_training(
     os.makedirs(new_path, exist_ok=True)
 
     assert E.shape[1] == 3
-    assert E.shape[0] == n2_values.shape[0], f"field[0] is {E.shape[0]}, n2_values[0] is {n2_values.shape[0]}"
-    assert E.shape[0] == isat_values.shape[0], f"field[0] is {E.shape[0]}, isat_values[0] is {isat_values.shape[0]}"
+    image_indices, variant_indices, variants = augmentations
+    assert image_indices.shape[0] == n2_values.shape[0], f"field[0] is {image_indices.shape[0]}, n2_values[0] is {n2_values.shape[0]}"
+    assert image_indices.shape[0] == isat_values.shape[0], f"field[0] is {image_indices.shape[0]}, isat_values[0] is {isat_values.shape[0]}"
 
     print("---- MODEL INITIALIZING ----")
     cnn, optimizer, criterion, scheduler = network_init(learning_rate, E.shape[1], Inception_ResNetv2)
     cnn = cnn.to(device)
     
     print("---- DATA TREATMENT ----")
-    train, validation, test = data_split(E, n2_values_normalized, isat_values_normalized, 0.8, 0.1, 0.1)
+    train, validation, test = data_split(augmentations, n2_values_normalized, isat_values_normalized, 0.8, 0.1, 0.1)
 
 
-    trainloader = create_loaders(train, batch_size)
-    validationloader = create_loaders(validation, batch_size)
-    testloader = create_loaders(test, batch_size )
+    trainloader = create_loaders(E, train, batch_size)
+    validationloader = create_loaders(E, validation, batch_size)
+    testloader = create_loaders(E, test, batch_size )
 
     model_settings = cnn, optimizer, criterion, scheduler, num_epochs, accumulation_steps, device
 
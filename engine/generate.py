@@ -12,9 +12,8 @@ import kornia.augmentation as K
 from cupyx.scipy.ndimage import zoom
 from scipy.constants import c, epsilon_0
 from engine.seed_settings import set_seed
-from skimage.restoration import unwrap_phase
 from engine.treament import elastic_saltpepper
-from engine.treament import experiment_noise, normalize_data
+from engine.treament import experiment_noise, normalize_data, least_squares_unwrap
 
 set_seed(10)
 
@@ -57,25 +56,25 @@ def data_creation(
       simu.delta_z = delta_z
       A = simu.out_field(beam, z=length, verbose=False, plot=False, normalize=True, precision="single")
     
-      density = np.abs(A)**2 * c * epsilon_0 / 2
-      phase = np.angle(A)
-      uphase = unwrap_phase(phase)
-      
       if crop != 0:
-        density = density[:,crop:-crop,crop:-crop]
-        phase = phase[:,crop:-crop,crop:-crop] 
-        uphase = uphase[:,crop:-crop,crop:-crop] 
+        A = A[:,crop:-crop,crop:-crop]
+    
+      A_cp = cp.asarray(A)
+      density_cp = cp.abs(A_cp)**2 * c * epsilon_0 / 2
+      phase_cp = cp.angle(A_cp)
+      uphase_cp = least_squares_unwrap(phase_cp)
 
-      zoom_factor = resolution_training / phase.shape[-1]
-      density_cp = zoom(cp.asarray(density), (1, zoom_factor, zoom_factor),order=3)
-      density = normalize_data(density_cp.get()).astype(np.float16)  
+      zoom_factor = resolution_training / A.shape[-1]
+      density_cp = zoom(density_cp, (1, zoom_factor, zoom_factor),order=3)
+      density = normalize_data(density_cp).astype(cp.float16).get()  
 
-      phase_cp = zoom(cp.asarray(phase), (1, zoom_factor, zoom_factor),order=3)
-      phase = normalize_data(phase_cp.get()).astype(np.float16)
+      phase_cp = zoom(phase_cp, (1, zoom_factor, zoom_factor),order=3)
+      phase = normalize_data(phase_cp).astype(cp.float16).get()
 
-      uphase_cp = zoom(cp.asarray(uphase), (1, zoom_factor, zoom_factor),order=3)
-      uphase = normalize_data(uphase_cp.get()).astype(np.float16)
+      uphase_cp = zoom(uphase_cp, (1, zoom_factor, zoom_factor),order=3)
+      uphase = normalize_data(uphase_cp).astype(cp.float16).get()
 
+      del A_cp
       del density_cp
       del phase_cp
       del uphase_cp
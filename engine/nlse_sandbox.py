@@ -4,11 +4,10 @@
 
 import cupy as cp
 import numpy as np
-from scipy.ndimage import zoom
 import matplotlib.pyplot as plt
 from engine.generate import data_creation
-from skimage.restoration import unwrap_phase
-from mpl_toolkits.axes_grid1 import make_axes_locatable
+from engine.treament import experiment_preprocessing
+from mpl_toolkits.axes_grid1 import ImageGrid
 
 
 def experiment(
@@ -16,15 +15,7 @@ def experiment(
         exp_image_path: str
         ):
     field = np.load(exp_image_path)
-    density_experiment = zoom(np.abs(field), 
-                (resolution_training/field.shape[-2], resolution_training/field.shape[-1])).astype(np.float16)
-    phase_experiment = np.angle(field)
-    uphase_experiment = zoom(np.abs(unwrap_phase(phase_experiment)), 
-                (resolution_training/field.shape[-2], resolution_training/field.shape[-1])).astype(np.float16)
-    phase_experiment = zoom(phase_experiment, 
-                (resolution_training/field.shape[-2], resolution_training/field.shape[-1])).astype(np.float16)
-    
-    return density_experiment, phase_experiment, uphase_experiment
+    return experiment_preprocessing(field, resolution_training)
 
 def plot_sandbox(E, density_experiment, phase_experiment, uphase_experiment, resolution_training, window_out,
                  n2, isat, input_power, non_locality_length, saving_path):
@@ -35,7 +26,9 @@ def plot_sandbox(E, density_experiment, phase_experiment, uphase_experiment, res
 
     plt.rcParams['font.family'] = 'DejaVu Serif'
     plt.rcParams['font.size'] = 10
-    fig, axs = plt.subplots(3, 2, figsize=(10, 15))
+    fig = plt.figure(figsize=(10, 15))
+    grid = ImageGrid(fig, 111, nrows_ncols=(3, 2), axes_pad=(1.5, 1.0), label_mode="all", 
+                     cbar_mode="each", cbar_location="right", cbar_size="5%", cbar_pad=0.05)
 
     n2_str = r"$n_2$"
     n2_u = r"$m^2$/$W$"
@@ -49,95 +42,29 @@ def plot_sandbox(E, density_experiment, phase_experiment, uphase_experiment, res
     title = f"{n2_str} = {n2:.2e}{n2_u}, {isat_str} = {isat:.2e}{isat_u}, {puiss_str} = {input_power:.2e}{puiss_u}, {nl_str} = {non_locality_length:.2e}{nl_u}"
     fig.suptitle(title)
 
-    im1 = axs[0, 0].imshow(E[0, 0, :, :], cmap="viridis")
-    im2 = axs[1, 0].imshow(E[0, 1, :, :], cmap="twilight_shifted")
-    im3 = axs[2, 0].imshow(E[0, 2, :, :], cmap="viridis")
-    im5 = axs[0, 1].imshow(density_experiment, cmap="viridis")
-    im6 = axs[1, 1].imshow(phase_experiment, cmap="twilight_shifted")
-    im7 = axs[2, 1].imshow(uphase_experiment, cmap="viridis")
-
-
-    divider1 = make_axes_locatable(axs[0, 0])
-    divider2 = make_axes_locatable(axs[1, 0])
-    divider3 = make_axes_locatable(axs[2, 0])
-    divider5 = make_axes_locatable(axs[0, 1])
-    divider6 = make_axes_locatable(axs[1, 1])
-    divider7 = make_axes_locatable(axs[2, 1])
-
-    cax1 = divider1.append_axes("right", size="5%", pad=0.05)
-    cax2 = divider2.append_axes("right", size="5%", pad=0.05)
-    cax3 = divider3.append_axes("right", size="5%", pad=0.05)
-    cax5 = divider5.append_axes("right", size="5%", pad=0.05)
-    cax6 = divider6.append_axes("right", size="5%", pad=0.05)
-    cax7 = divider7.append_axes("right", size="5%", pad=0.05)
-
-
-    cbar1 = plt.colorbar(im1, cax=cax1)
-    cbar2 = plt.colorbar(im2, cax=cax2)
-    cbar3 = plt.colorbar(im3, cax=cax3)
-    cbar5 = plt.colorbar(im5, cax=cax5)
-    cbar6 = plt.colorbar(im6, cax=cax6)
-    cbar7 = plt.colorbar(im7, cax=cax7)
-
-    axs[0, 0].set_title("Density")
-    axs[0, 0].set_xticks([0, output_shape[1]//2, output_shape[1]])
-    axs[0, 0].set_xticklabels(label_x)
-    axs[0, 0].set_xlabel(r"x (mm)")
-    axs[0, 0].set_yticks([0, output_shape[0]//2, output_shape[0]])
-    axs[0, 0].set_yticklabels(label_y)
-    axs[0, 0].set_ylabel(r"y (mm)")
-
-    axs[1, 0].set_title("Phase")
-    axs[1, 0].set_xticks([0, output_shape[1]//2, output_shape[1]])
-    axs[1, 0].set_xticklabels(label_x)
-    axs[1, 0].set_xlabel(r"x (mm)")
-    axs[1, 0].set_yticks([0, output_shape[0]//2, output_shape[0]])
-    axs[1, 0].set_yticklabels(label_y)
-    axs[1, 0].set_ylabel(r"y (mm)")
-
-    axs[2, 0].set_title("Phase Unwrap")
-    axs[2, 0].set_xticks([0, output_shape[1]//2, output_shape[1]])
-    axs[2, 0].set_xticklabels(label_x)
-    axs[2, 0].set_xlabel(r"x (mm)")
-    axs[2, 0].set_yticks([0, output_shape[0]//2, output_shape[0]])
-    axs[2, 0].set_yticklabels(label_y)
-    axs[2, 0].set_ylabel(r"y (mm)")
-
-    axs[0, 1].set_title("Experimental Density")
-    axs[0, 1].set_xticks([0, output_shape[1]//2, output_shape[1]])
-    axs[0, 1].set_xticklabels(label_x)
-    axs[0, 1].set_xlabel(r"x (mm)")
-    axs[0, 1].set_yticks([0, output_shape[0]//2, output_shape[0]])
-    axs[0, 1].set_yticklabels(label_y)
-    axs[0, 1].set_ylabel(r"y (mm)")
-
-    axs[1, 1].set_title("Experimental Phase")
-    axs[1, 1].set_xticks([0, output_shape[1]//2, output_shape[1]])
-    axs[1, 1].set_xticklabels(label_x)
-    axs[1, 1].set_xlabel(r"x (mm)")
-    axs[1, 1].set_yticks([0, output_shape[0]//2, output_shape[0]])
-    axs[1, 1].set_yticklabels(label_y)
-    axs[1, 1].set_ylabel(r"y (mm)")
-
-    axs[2, 1].set_title("Experimental Phase Unwrap")
-    axs[2, 1].set_xticks([0, output_shape[1]//2, output_shape[1]])
-    axs[2, 1].set_xticklabels(label_x)
-    axs[2, 1].set_xlabel(r"x (mm)")
-    axs[2, 1].set_yticks([0, output_shape[0]//2, output_shape[0]])
-    axs[2, 1].set_yticklabels(label_y)
-    axs[2, 1].set_ylabel(r"y (mm)")
-
-
-
-    axs[0, 0].tick_params(axis='both', which='major', pad=15)
-    axs[1, 0].tick_params(axis='both', which='major', pad=15)
-    axs[2, 0].tick_params(axis='both', which='major', pad=15)
-    axs[0, 1].tick_params(axis='both', which='major', pad=15)
-    axs[1, 1].tick_params(axis='both', which='major', pad=15)
-    axs[2, 1].tick_params(axis='both', which='major', pad=15)
-
-    plt.tight_layout()
-    plt.savefig(f"{saving_path}/sandbox.png")
+    panels = [
+        (E[0, 0, :, :], "viridis", "Density"),
+        (density_experiment, "viridis", "Experimental Density"),
+        (E[0, 1, :, :], "twilight_shifted", "Phase"),
+        (phase_experiment, "twilight_shifted", "Experimental Phase"),
+        (E[0, 2, :, :], "viridis", "Phase Unwrap"),
+        (uphase_experiment, "viridis", "Experimental Phase Unwrap"),
+    ]
+
+    for ax, (image, cmap, name) in zip(grid, panels):
+        im = ax.imshow(image, cmap=cmap)
+        ax.cax.colorbar(im)
+
+        ax.set_title(name)
+        ax.set_xticks([0, output_shape[1]//2, output_shape[1]])
+        ax.set_xticklabels(label_x)
+        ax.set_xlabel(r"x (mm)")
+        ax.set_yticks([0, output_shape[0]//2, output_shape[0]])
+        ax.set_yticklabels(label_y)
+        ax.set_ylabel(r"y (mm)")
+        ax.tick_params(axis='both', which='major', pad=15)
+
+    plt.savefig(f"{saving_path}/sandbox.png", bbox_inches="tight")
 
 def sandbox(device: int, 
             resolution_input_beam: int,
@@ -161,8 +88,7 @@ def sandbox(device: int,
     
     with cp.cuda.Device(device):
         E = data_creation(nlse_settings, cameras, device)
-
-    density_experiment, phase_experiment, uphase_experiment = experiment(resolution_training, exp_image_path)
+        density_experiment, phase_experiment, uphase_experiment = experiment(resolution_training, exp_image_path)
 
     plot_sandbox(E, density_experiment, phase_experiment, uphase_experiment, 
                  resolution_training, window_out, n2, isat, input_power, 
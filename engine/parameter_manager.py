@@ -31,20 +31,23 @@ def manager(generate: bool,
             learning_rate: float = 0.01, 
             batch_size: int = 100, 
             num_epochs: int = 60, 
-            accumulator: int = 1
+            accumulator: int = 1,
+            quantized: bool = False,
+            mixed_precision: bool = False,
+            deterministic: bool = False
             ) -> None:
     
     cameras = resolution_input_beam, window_input, window_out, resolution_training
     nlse_settings = n2, input_power, alpha, isat, waist_input_beam, non_locality_length, delta_z, cell_length
 
     if generate or training:
-        import gc
         import cupy as cp
         from engine.generate import data_creation, generate_labels
         from engine.augment import data_augmentation
         from engine.visualize import plot_and_save_images
         from engine.finder import manage_training, prepare_training
-        
+        # The engine modules call set_seed(10) when imported, the cuDNN settings are applied after them.
+        set_seed(10, deterministic)
         
         if generate:
             with cp.cuda.Device(device):
@@ -56,15 +59,13 @@ def manager(generate: bool,
             plot_and_save_images(E, saving_path, nlse_settings)
 
         labels = generate_labels(n2, isat)
-        E, labels = data_augmentation(E, labels)
+        augmentations, labels = data_augmentation(E, labels)
 
         if training:
             print("---- TRAINING ----")
-            trainloader, validationloader, testloader, model_settings, new_path = prepare_training(nlse_settings, labels, E, saving_path, 
+            trainloader, validationloader, testloader, model_settings, new_path = prepare_training(nlse_settings, labels, E, augmentations, saving_path, 
                                                                                                    learning_rate, batch_size, num_epochs, 
                                                                                                     accumulator, device)
-            del E
-            gc.collect()
             manage_training(trainloader, validationloader, testloader, model_settings, 
                             nlse_settings, new_path, resolution_training, labels)
     
@@ -76,5 +77,6 @@ def manager(generate: bool,
 
     if use:
         from engine.use import get_parameters
+        set_seed(10, deterministic)
         print("---- COMPUTING PARAMETERS ----\n")
-        get_parameters(exp_image_path, saving_path, resolution_training, nlse_settings, device, cameras, plot_generate_compare)
\ No newline at end of file
+        get_parameters(exp_image_path, saving_path, resolution_training, nlse_settings, device, cameras, plot_generate_compare, quantized, mixed_precision)
\ No newline at end of file
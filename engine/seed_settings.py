@@ -8,13 +8,16 @@ import numpy as np
 
 
 def set_seed(
-        seed: int
+        seed: int,
+        deterministic: bool = False
         ) -> None:
     random.seed(seed)
     np.random.seed(seed)
     torch.manual_seed(seed)
     torch.cuda.manual_seed(seed)
     torch.cuda.manual_seed_all(seed)
-    torch.backends.cudnn.deterministic = True
-    torch.backends.cudnn.benchmark = False
+    # cuDNN autotuning picks the fastest convolution algorithms for the fixed input shape,
+    # at the cost of bitwise reproducibility between runs.
+    torch.backends.cudnn.deterministic = deterministic
+    torch.backends.cudnn.benchmark = not deterministic
     os.environ['PYTHONHASHSEED'] = str(seed)
\ No newline at end of file
@@ -4,7 +4,11 @@
 import torch
 import random
 import numpy as np
+from functools import lru_cache
 import kornia.augmentation as K
+import cupy as cp
+from cupyx.scipy.ndimage import zoom
+from cupyx.scipy.fft import dctn, idctn
 from engine.seed_settings import set_seed
 
 set_seed(10)
@@ -12,10 +16,94 @@ set_seed(10)
 def normalize_data(
         data: np.ndarray,
         ) -> np.ndarray: 
-    data -= np.min(data, axis=(-2, -1), keepdims=True)
-    data /= np.max(data, axis=(-2, -1), keepdims=True)
+    minimum = np.min(data, axis=(-2, -1), keepdims=True)
+    maximum = np.max(data, axis=(-2, -1), keepdims=True)
+    data -= minimum
+    data /= maximum - minimum
     return data
 
+def least_squares_unwrap(
+        phase: cp.ndarray
+        ) -> cp.ndarray:
+    """
+    Unwraps a batch of 2D phases with the unweighted least squares method (Ghiglia & Romero).
+
+    The Poisson equation of the wrapped phase gradients is solved with a DCT over the last two axes,
+    so every image of the batch is unwrapped independently on the GPU.
+    The result is then brought back to the wrapped phase plus an integer number of 2*pi,
+    after removing the arbitrary constant offset of the least squares solution.
+
+    Parameters:
+    - phase (cp.ndarray): The wrapped phase of shape (..., H, W).
+
+    Returns:
+    - uphase (cp.ndarray): The unwrapped phase.
+    """
+    height, width = phase.shape[-2:]
+
+    dx = cp.diff(phase, axis=-1)
+    dx -= 2*np.pi*cp.rint(dx/(2*np.pi))
+    dy = cp.diff(phase, axis=-2)
+    dy -= 2*np.pi*cp.rint(dy/(2*np.pi))
+
+    rho = cp.zeros_like(phase)
+    rho[..., :, :-1] += dx
+    rho[..., :, 1:] -= dx
+    rho[..., :-1, :] += dy
+    rho[..., 1:, :] -= dy
+
+    eigenvalues = (2*cp.cos(np.pi*cp.arange(height, dtype=phase.dtype)/height)[:, cp.newaxis] 
+                   + 2*cp.cos(np.pi*cp.arange(width, dtype=phase.dtype)/width)[cp.newaxis, :] - 4)
+    eigenvalues[0, 0] = 1
+
+    uphase_hat = dctn(rho, type=2, axes=(-2, -1), norm="ortho")
+    uphase_hat /= eigenvalues
+    uphase_hat[..., 0, 0] = 0
+    uphase = idctn(uphase_hat, type=2, axes=(-2, -1), norm="ortho")
+
+    # The least squares solution is only defined up to a constant, it is removed before rounding
+    # so that the number of 2*pi does not flip across the frame when the offset is close to pi.
+    offset = cp.angle(cp.mean(cp.exp(1j*(uphase - phase)), axis=(-2, -1), keepdims=True))
+    uphase = phase + 2*np.pi*cp.rint((uphase - offset - phase)/(2*np.pi))
+    return uphase
+
+def experiment_preprocessing(
+        field: np.ndarray,
+        resolution_training: int
+        ) -> tuple:
+    """
+    Computes the density, phase and unwrapped phase of an experimental field at the training resolution.
+    The unwrapping and the zooms are done on the current CuPy device.
+
+    Parameters:
+    - field (np.ndarray): The complex experimental field of shape (H, W) or (N, H, W).
+    - resolution_training (int): The resolution of the images used for training.
+
+    Returns:
+    - density (np.ndarray): The float16 zoomed density.
+    - phase (np.ndarray): The float16 zoomed phase.
+    - uphase (np.ndarray): The float16 zoomed unwrapped phase.
+    """
+    zoom_factor = (1,) * (field.ndim - 2) + (resolution_training/field.shape[-2], resolution_training/field.shape[-1])
+
+    field_cp = cp.asarray(field)
+    phase_cp = cp.angle(field_cp)
+
+    uphase_cp = least_squares_unwrap(phase_cp)
+    if field.ndim == 2:
+        uphase_cp = cp.abs(uphase_cp)
+
+    density = zoom(cp.abs(field_cp), zoom_factor, order=3).astype(cp.float16).get()
+    uphase = zoom(uphase_cp, zoom_factor, order=3).astype(cp.float16).get()
+    phase = zoom(phase_cp, zoom_factor, order=3).astype(cp.float16).get()
+
+    del field_cp
+    del phase_cp
+    del uphase_cp
+    cp.get_default_memory_pool().free_all_blocks()
+
+    return density, phase, uphase
+
 def elastic_saltpepper() -> torch.nn.Sequential:
     
     elastic_sigma = (random.randrange(35, 42, 2), random.randrange(35, 42, 2))
@@ -32,13 +120,12 @@ def experiment_noise(
         normal_noise_sigma: float
           )-> np.ndarray:
         
-    poisson_noise = np.random.poisson(lam=poisson_noise_lam, size=(beam.shape))*poisson_noise_lam*0.75
-    normal_noise = np.random.normal(0, normal_noise_sigma, (beam.shape))
-
-    total_noise = normal_noise + poisson_noise
-    noisy_beam = np.real(beam) + total_noise + 1j * np.imag(beam)
+    total_noise = np.random.poisson(lam=poisson_noise_lam, size=(beam.shape)).astype(np.float32)
+    total_noise *= poisson_noise_lam*0.75
+    total_noise += np.random.normal(0, normal_noise_sigma, (beam.shape))
 
-    noisy_beam = noisy_beam.astype(np.complex64)
+    noisy_beam = beam.astype(np.complex64)
+    noisy_beam.real += total_noise
     return noisy_beam
 
 def salt_and_pepper_noise(image, noise_level):
@@ -49,41 +136,42 @@ def salt_and_pepper_noise(image, noise_level):
     noisy[probs > 1 - noise_level / 2] = np.max(image)
     return noisy
 
-def line_noise(
-        image: np.ndarray,
+@lru_cache(maxsize=64)
+def lines_pattern(
+        height: int,
+        width: int,
         num_lines: int, 
-        amplitude: float, 
         angle: float
         ) -> np.ndarray:
     """
-    Applies a pattern of lines at a specified angle across the image.
+    Computes a unit amplitude pattern of lines at a specified angle.
+
+    The pattern only depends on the image shape, the number of lines and the angle,
+    so it is cached and shared between every image noised with the same settings.
 
     Parameters:
-        image (np.ndarray): The original image to which noise will be added.
-        num_lines (int): The number of lines (complete sine wave cycles) to be applied.
-        amplitude (float): The amplitude of the lines pattern, determining the intensity variation.
+        height (int): The height of the image.
+        width (int): The width of the image.
+        num_lines (int): The number of lines (complete sine wave cycles) in the pattern.
         angle (float): The angle of the lines in degrees, measured counter-clockwise from the horizontal axis.
 
     Returns:
-        np.ndarray: The image with the applied lines pattern.
+        np.ndarray: The read-only float32 lines pattern of shape (height, width).
     """
-    height, width = image.shape
     # Convert the angle from degrees to radians
     angle_rad = np.radians(angle)
     
-    # Create a grid of coordinates
-    X, Y = np.meshgrid(np.arange(width), np.arange(height))
-    
-    # Rotate the coordinate system by the specified angle
-    X_rotated = X * np.cos(angle_rad) + Y * np.sin(angle_rad)
-    
     # Calculate the wave frequency for the desired number of lines
     diagonal_length = np.sqrt(width**2 + height**2)
     wave_frequency = (num_lines * 2 * np.pi) / diagonal_length
     
-    # Apply the sine function to create the lines pattern
-    lines_pattern =  amplitude*np.sin(X_rotated * wave_frequency)
-    
-    noisy_image = image.copy() + lines_pattern
+    # Rotate the coordinate system by the specified angle as an outer sum of 1D axes
+    x = np.arange(width, dtype=np.float32)
+    y = np.arange(height, dtype=np.float32)
+    pattern = (np.float32(wave_frequency * np.cos(angle_rad)) * x[np.newaxis, :] 
+               + np.float32(wave_frequency * np.sin(angle_rad)) * y[:, np.newaxis])
     
-    return noisy_image
\ No newline at end of file
+    # Apply the sine function to create the lines pattern
+    np.sin(pattern, out=pattern)
+    pattern.flags.writeable = False
+    return pattern
\ No newline at end of file
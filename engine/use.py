@@ -2,20 +2,84 @@
 # -*- coding: utf-8 -*-
 # @author: Louis Rossignol
 
+import os
 import torch
+import cupy as cp
 import numpy as np
-from scipy.ndimage import zoom
 from matplotlib import pyplot as plt
 from engine.seed_settings import set_seed
 from engine.generate import data_creation
 from engine.model import Inception_ResNetv2
-from skimage.restoration import unwrap_phase
+from engine.treament import experiment_preprocessing
+from torch.ao.quantization import get_default_qconfig_mapping
+from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
 
 
 
 
 set_seed(10)
 
+def quantize_network(
+        cnn: torch.nn.Module,
+        calibration_set: np.ndarray,
+        batch_size: int = 16
+        ) -> torch.nn.Module:
+    """
+    Converts the network to int8 with post-training static quantization for CPU inference.
+
+    Parameters:
+    - cnn (torch.nn.Module): The trained float network on the CPU.
+    - calibration_set (np.ndarray): The images used to calibrate the activation ranges.
+    - batch_size (int): The batch size of the calibration forward passes.
+
+    Returns:
+    - cnn (torch.nn.Module): The quantized network.
+    """
+    cnn.eval()
+    example_inputs = (torch.from_numpy(calibration_set[:1]).float(),)
+    prepared = prepare_fx(cnn, get_default_qconfig_mapping("fbgemm"), example_inputs)
+
+    with torch.no_grad():
+        for start in range(0, calibration_set.shape[0], batch_size):
+            prepared(torch.from_numpy(calibration_set[start:start+batch_size]).float())
+
+    return convert_fx(prepared)
+
+def load_quantized_network(
+        cnn: torch.nn.Module,
+        model_path: str,
+        dataset_path: str,
+        calibration_size: int = 256
+        ) -> torch.nn.Module:
+    """
+    Loads the int8 network saved next to the float model, or creates it by calibrating on the training set.
+    The int8 network is rebuilt if it is older than the float model, i.e. after a new training.
+
+    Parameters:
+    - cnn (torch.nn.Module): The trained float network on the CPU.
+    - model_path (str): The path of the float model.
+    - dataset_path (str): The path of the generated dataset used for calibration.
+    - calibration_size (int): The number of images used for calibration.
+
+    Returns:
+    - cnn (torch.nn.Module): The quantized network.
+    """
+    quantized_path = model_path.replace(".pth", "_int8.pt")
+    if os.path.exists(quantized_path) and os.path.getmtime(quantized_path) >= os.path.getmtime(model_path):
+        return torch.jit.load(quantized_path)
+    
+    if not os.path.exists(dataset_path):
+        raise FileNotFoundError(f"quantized=True needs the generated dataset {dataset_path} to calibrate the int8 model "
+                                "the first time (or after a new training). Generate it or run with quantized=False.")
+    dataset = np.load(dataset_path, mmap_mode="r")
+    indices = np.sort(np.random.choice(dataset.shape[0], min(calibration_size, dataset.shape[0]), replace=False))
+    calibration_set = np.ascontiguousarray(dataset[indices])
+
+    cnn = quantize_network(cnn, calibration_set)
+    cnn = torch.jit.trace(cnn, torch.from_numpy(calibration_set[:1]).float())
+    torch.jit.save(cnn, quantized_path)
+    return cnn
+
 def get_parameters(
         exp_path: str,
         saving_path: str, 
@@ -23,7 +87,9 @@ def get_parameters(
         nlse_settings: tuple, 
         device_number: int, 
         cameras: tuple, 
-        plot_generate_compare: bool):
+        plot_generate_compare: bool,
+        quantized: bool = False,
+        mixed_precision: bool = False):
     n2, in_power, alpha, isat, waist, nl_length, delta_z, length = nlse_settings
     resolution_in, window_in, window_out, resolution_training = cameras
     
@@ -33,47 +99,39 @@ def get_parameters(
     min_n2 = n2.min()
     max_isat = isat.max()
 
-    device = torch.device(f"cuda:{device_number}")
+    model_path = f'{saving_path}/training_n2{number_of_n2}_isat{number_of_isat}_power{in_power:.2f}/n2_net_w{resolution_out}_n2{number_of_n2}_isat{number_of_isat}_power{in_power:.2f}.pth'
     cnn = Inception_ResNetv2(in_channels=3)
-    cnn.to(device)
-    cnn.load_state_dict(torch.load(f'{saving_path}/training_n2{number_of_n2}_isat{number_of_isat}_power{in_power:.2f}/n2_net_w{resolution_out}_n2{number_of_n2}_isat{number_of_isat}_power{in_power:.2f}.pth'))
+    state_dict = torch.load(model_path, map_location="cpu", mmap=True, weights_only=True)
+    cnn.load_state_dict(state_dict, assign=True)
+    cnn.eval()
+
+    if quantized:
+        device = torch.device("cpu")
+        dataset_path = f'{saving_path}/Es_w{resolution_out}_n2{number_of_n2}_isat{number_of_isat}_power{in_power:.2f}.npy'
+        cnn = load_quantized_network(cnn, model_path, dataset_path)
+    else:
+        device = torch.device(f"cuda:{device_number}")
+        cnn = cnn.to(device, memory_format=torch.channels_last)
     
     field = np.load(exp_path)
-    if len(field.shape) == 2: 
-
-        density = zoom(np.abs(field), 
-                    (resolution_training/field.shape[-2], resolution_training/field.shape[-1])).astype(np.float16)
-        phase = np.angle(field)
-        uphase = zoom(np.abs(unwrap_phase(phase)), 
-                    (resolution_training/field.shape[-2], resolution_training/field.shape[-1])).astype(np.float16)
-        phase = zoom(phase, 
-                    (resolution_training/field.shape[-2], resolution_training/field.shape[-1])).astype(np.float16)
-        
-        E = np.zeros((1, 3, 256, 256), dtype=np.float16)
-        E[0, 0, :, :] = density
-        E[0, 1, :, :] = phase
-        E[0, 2, :, :] = uphase
-
-    else:
-        density = zoom(np.abs(field), 
-                    (1, resolution_training/field.shape[-2], resolution_training/field.shape[-1])).astype(np.float16)
-        phase = np.angle(field)
-        uphase = zoom(unwrap_phase(phase), 
-                    (1, resolution_training/field.shape[-2], resolution_training/field.shape[-1])).astype(np.float16)
-        phase = zoom(phase, 
-                    (1, resolution_training/field.shape[-2], resolution_training/field.shape[-1])).astype(np.float16)
-        
-        E = np.zeros((field.shape[0], 3, 256, 256), dtype=np.float16)
-        E[:, 0, :, :] = density
-        E[:, 1, :, :] = phase
-        E[:, 2, :, :] = uphase
+    with cp.cuda.Device(device_number):
+        density, phase, uphase = experiment_preprocessing(field, resolution_training)
     
-    with torch.no_grad():
-        images = torch.from_numpy(E).float().to(device)
+    E = torch.empty((1 if field.ndim == 2 else field.shape[0], 3, resolution_training, resolution_training), dtype=torch.float16, pin_memory=not quantized)
+    E[:, 0, :, :].copy_(torch.from_numpy(density))
+    E[:, 1, :, :].copy_(torch.from_numpy(phase))
+    E[:, 2, :, :].copy_(torch.from_numpy(uphase))
+    
+    if quantized:
+        images = E.float()
+    else:
+        images = E.to(device, non_blocking=True).to(dtype=torch.float32, memory_format=torch.channels_last)
+
+    with torch.inference_mode(), torch.autocast(device_type="cuda", dtype=torch.bfloat16, enabled=mixed_precision and not quantized):
         outputs_n2, outputs_isat = cnn(images)
     
-    computed_n2 = outputs_n2[0,0].cpu().numpy()*min_n2
-    computed_isat = outputs_isat[0,0].cpu().numpy()*max_isat
+    computed_n2 = outputs_n2[0,0].float().cpu().numpy()*min_n2
+    computed_isat = outputs_isat[0,0].float().cpu().numpy()*max_isat
 
     print(f"n2 = {computed_n2} m^2/W")
     print(f"Isat = {computed_isat} W/m^2")
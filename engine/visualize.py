@@ -1,6 +1,64 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+def mosaic(
+        channels: np.ndarray,
+        cmap: str
+        ) -> np.ndarray:
+    """
+    Tiles a set of images into a single RGB image.
+
+    Each tile is scaled to its own range, as imshow would do, and mapped through a lookup table of the colormap.
+
+    Parameters:
+    - channels (np.ndarray): The images of shape (number_of_n2, number_of_isat, H, W).
+    - cmap (str): The name of the matplotlib colormap.
+
+    Returns:
+    - image (np.ndarray): The uint8 RGB image of shape (number_of_n2*H, number_of_isat*W, 3).
+    """
+    number_of_n2, number_of_isat, height, width = channels.shape
+    lut = (plt.get_cmap(cmap)(np.linspace(0, 1, 256))[:, :3]*255).astype(np.uint8)
+
+    tiles = channels.astype(np.float32)
+    tiles -= np.min(tiles, axis=(-2, -1), keepdims=True)
+    tiles /= np.maximum(np.max(tiles, axis=(-2, -1), keepdims=True), np.finfo(np.float32).tiny)
+    tiles *= 255
+
+    image = lut[tiles.astype(np.uint8)]
+    return image.transpose(0, 2, 1, 3, 4).reshape(number_of_n2*height, number_of_isat*width, 3)
+
+def plot_mosaic(
+        channels: np.ndarray,
+        cmap: str,
+        title: str,
+        n2: np.ndarray,
+        isat: np.ndarray,
+        path: str
+        ) -> None:
+    
+    number_of_n2, number_of_isat, height, width = channels.shape
+
+    n2_str = r"$n_2$"
+    n2_u = r"$m^2$/$W$"
+    isat_str = r"$I_{sat}$"
+    isat_u = r"$W$/$m^2$"
+
+    fig, ax = plt.subplots(figsize=(10*number_of_isat,10*number_of_n2))
+    fig.suptitle(title)
+
+    ax.imshow(mosaic(channels, cmap), interpolation="nearest")
+    ax.set_xticks(np.arange(number_of_isat)*width + width/2)
+    ax.set_xticklabels([f'{value:.2e}' for value in isat])
+    ax.set_xlabel(f'{isat_str} ({isat_u})')
+    ax.set_yticks(np.arange(number_of_n2)*height + height/2)
+    ax.set_yticklabels([f'{value:.2e}' for value in n2])
+    ax.set_ylabel(f'{n2_str} ({n2_u})')
+
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close(fig)
+
 def plot_and_save_images(
         data: np.ndarray, 
         saving_path: str, 
@@ -11,61 +69,24 @@ def plot_and_save_images(
     number_of_n2 = len(n2)
     number_of_isat = len(isat)
 
-    field = data.copy().reshape(number_of_n2, number_of_isat, 3, data.shape[-2], data.shape[-2])
+    field = data.reshape(number_of_n2, number_of_isat, 3, data.shape[-2], data.shape[-2])
     density_channels = field[:,  :, 0, :, :]
     phase_channels = field[:, :, 1, :, :]
     uphase_channels = field[:, :, 2, :, :]
     
-    n2_str = r"$n_2$"
-    n2_u = r"$m^2$/$W$"
-    isat_str = r"$I_{sat}$"
-    isat_u = r"$W$/$m^2$"
     puiss_str = r"$p$"
     puiss_u = r"$W$"
     
     plt.rcParams['font.family'] = 'DejaVu Serif'
     plt.rcParams['font.size'] = 50
 
-    fig_density, axes_density = plt.subplots(number_of_n2, number_of_isat, figsize=(10*number_of_isat,10*number_of_n2))
-    fig_density.suptitle(f'Density Channels - {puiss_str} = {input_power:.2e} {puiss_u}')
-
-    for n in range(number_of_n2):
-        for i in range(number_of_isat):
-            ax = axes_density if number_of_n2 == 1 and number_of_isat == 1 else (axes_density[n, i] if number_of_n2 > 1 and number_of_n2 > 1 else (axes_density[n] if number_of_n2 > 1 else axes_density[i]))
-            ax.imshow(density_channels[n, i, :, :], cmap='viridis')
-            ax.set_title(f'{n2_str} = {n2[n]:.2e} {n2_u},\n{isat_str} = {isat[i]:.2e} {isat_u}')
-            ax.axis('off')
-
-    plt.tight_layout()
-    plt.savefig(f'{saving_path}/density_n2{number_of_n2}_isat{number_of_isat}_power{input_power:.2f}.png')
-    plt.close(fig_density) 
+    plot_mosaic(density_channels, 'viridis', f'Density Channels - {puiss_str} = {input_power:.2e} {puiss_u}', n2, isat, 
+                f'{saving_path}/density_n2{number_of_n2}_isat{number_of_isat}_power{input_power:.2f}.png')
 
     # Plot phase channels for the current power value
-    fig_phase, axes_phase = plt.subplots(number_of_n2, number_of_isat, figsize=(10*number_of_isat,10*number_of_n2))
-    fig_phase.suptitle(f'Phase Channels - {puiss_str} = {input_power:.2e} {puiss_u}')
-
-    for n in range(number_of_n2):
-        for i in range(number_of_isat):
-            ax = axes_phase if number_of_n2 == 1 and number_of_isat == 1 else (axes_phase[n, i] if number_of_n2 > 1 and number_of_isat > 1 else (axes_phase[n] if number_of_n2 > 1 else axes_phase[i]))
-            ax.imshow(phase_channels[n, i, :, :], cmap='twilight_shifted')
-            ax.set_title(f'{n2_str} = {n2[n]:.2e} {n2_u},\n{isat_str} = {isat[i]:.2e} {isat_u}')
-            ax.axis('off')
-
-    plt.tight_layout()
-    plt.savefig(f'{saving_path}/phase_n2{number_of_n2}_isat{number_of_isat}_power{input_power:.2f}.png')
-    plt.close(fig_phase)
+    plot_mosaic(phase_channels, 'twilight_shifted', f'Phase Channels - {puiss_str} = {input_power:.2e} {puiss_u}', n2, isat, 
+                f'{saving_path}/phase_n2{number_of_n2}_isat{number_of_isat}_power{input_power:.2f}.png')
 
     #Plot phase channels for the current power value
-    fig_phase, axes_phase = plt.subplots(number_of_n2, number_of_isat, figsize=(50,50))
-    fig_phase.suptitle(f'Unwrap Phase Channels - {puiss_str} = {input_power:.2e} {puiss_u}')
-
-    for n in range(number_of_n2):
-        for i in range(number_of_isat):
-            ax = axes_phase if number_of_n2 == 1 and number_of_isat == 1 else (axes_phase[n, i] if number_of_n2 > 1 and number_of_isat > 1 else (axes_phase[n] if number_of_n2 > 1 else axes_phase[i]))
-            ax.imshow(uphase_channels[n, i, :, :], cmap='viridis')
-            ax.set_title(f'{n2_str} = {n2[n]:.2e} {n2_u},\n{isat_str} = {isat[i]:.2e} {isat_u}')
-            ax.axis('off')
-
-    plt.tight_layout()
-    plt.savefig(f'{saving_path}/unwrap_phase_n2{number_of_n2}_isat{number_of_isat}_power{input_power:.2f}.png')
-    plt.close(fig_phase)
\ No newline at end of file
+    plot_mosaic(uphase_channels, 'viridis', f'Unwrap Phase Channels - {puiss_str} = {input_power:.2e} {puiss_u}', n2, isat, 
+                f'{saving_path}/unwrap_phase_n2{number_of_n2}_isat{number_of_isat}_power{input_power:.2f}.png')
\ No newline at end of file